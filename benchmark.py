@@ -11,17 +11,33 @@ Implementations:
   - human-dynamic: Human implementation with optimized bulk allocation
 
 Usage:
-    python benchmark.py [dictionary] [start_word] [runs]
+    python benchmark.py [--rebuild] [dictionary] [start_word] [runs] [warmups]
 
 Example:
-    python benchmark.py tests/data/stress.txt abc 5
+    python benchmark.py tests/data/stress.txt abc 5 1
+
+Binaries are only rebuilt when their sources changed; --rebuild forces
+a full rebuild.
+
+Each implementation is launched once with the program's `--repeat` option
+for `warmups` unmeasured runs followed by up to `runs` measured runs, so
+process startup is paid once. The program is stopped early once the
+spread (MAD / median) drops below PRECISION. Results are reported as
+median and MAD, which are robust against outliers such as a cold first
+run.
 """
 
+import gc
+import re
 import subprocess
 import sys
 import os
+import threading
 import time
 import statistics
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
 
 
@@ -31,118 +47,179 @@ IMPLEMENTATIONS = [
     {"name": "human-dynamic", "impl": "human", "mem": "dynamic", "label": "Human (dynamic)"},
 ]
 
+# Stop measuring once MAD / median falls below this (2%)
+PRECISION = 0.02
 
-def run_command(cmd: list[str], timeout: int = 300) -> tuple[int, str, float]:
-    """Run a command and return exit code, output, and elapsed time."""
-    start = time.perf_counter()
-    try:
-        result = subprocess.run(
-            cmd, 
-            capture_output=True, 
-            text=True, 
-            timeout=timeout
-        )
-        elapsed = time.perf_counter() - start
-        output = result.stdout + result.stderr
-        return result.returncode, output, elapsed
-    except subprocess.TimeoutExpired:
-        return -1, "TIMEOUT", timeout
-
-
-def build_implementation(impl_config: dict) -> bool:
-    """Build an implementation and return success status."""
+# Minimum measured runs before the precision check applies
+MIN_RUNS = 3
+
+# "Index built: 0.421 ms" or "Total execution time: Total: 1.23 s";
+# the optional prefix skips to the last "label: value" pair on the line
+_TIMING_RE = re.compile(
+    r'^(?:[^:\n]*:)?[ \t]*(?P<label>[^:\n]+):[ \t]*'
+    r'(?P<value>\d+(?:\.\d+)?)[ \t]*(?P<unit>ms|s)[ \t]*$'
+)
+
+# "Run 3: 12.345 ms", printed once per run with --repeat
+_RUN_RE = re.compile(
+    r'^Run \d+:[ \t]*(?P<value>\d+(?:\.\d+)?)[ \t]*(?P<unit>ms|s)[ \t]*$'
+)
+
+# "Found 1 chain(s) of length 4:"
+_RESULT_RE = re.compile(r'^Found\s+(\d+)\s+chain\(s\)\s+of\s+length\s+(\d+)')
+
+# Characters of output kept for error messages
+_HEAD_CHARS = 200
+
+
+def run_command(cmd: list[str], timeout: int = 300,
+                stop=None) -> tuple[int, dict, int]:
+    """Run a command and return exit code, parsed output, and elapsed time in ns."""
+    start = time.perf_counter_ns()
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        close_fds=False  # Keeps subprocess on the posix_spawn path
+    ) as proc:
+        # Reading blocks until the program exits, so kill it on timeout
+        timed_out = threading.Event()
+        
+        def kill():
+            timed_out.set()
+            proc.kill()
+        
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        try:
+            parsed = parse_output(proc.stdout, stop)
+            if parsed["stopped"]:
+                proc.kill()
+            code = proc.wait()
+        finally:
+            timer.cancel()
+    elapsed_ns = time.perf_counter_ns() - start
+    
+    if timed_out.is_set():
+        return -1, parsed, timeout * 1_000_000_000
+    if parsed["stopped"]:
+        code = 0
+    return code, parsed, elapsed_ns
+
+
+def build_implementation(impl_config: dict,
+                         rebuild: bool = False) -> tuple[bool, list[str]]:
+    """Build an implementation and return success status and messages."""
     name = impl_config["name"]
     impl = impl_config["impl"]
     mem = impl_config["mem"]
     
-    print(f"Building {name} implementation...")
+    messages = [f"Building {name} implementation..."]
     
     dst = Path(f"bin/anagram_chain_{name}")
     
-    # Build with proper flags
-    result = subprocess.run(
-        ["make", f"IMPL={impl}", f"MEM={mem}"],
-        capture_output=True,
-        text=True
-    )
+    # Build with proper flags, straight to the per-implementation binary
+    # so that several builds can run at the same time
+    cmd = ["make", f"IMPL={impl}", f"MEM={mem}", f"BIN={dst}"]
+    if rebuild:
+        cmd.append("-B")
+    result = subprocess.run(cmd, capture_output=True, text=True)
     
     if result.returncode != 0:
-        print(f"  ERROR: Build failed for {name}")
-        print(result.stderr)
-        return False
-    
-    # Rename binary
-    src = Path("bin/anagram_chain")
-    
-    if src.exists():
-        if dst.exists():
-            dst.unlink()
-        src.rename(dst)
-        print(f"  Built: {dst}")
-        return True
-    else:
-        print(f"  ERROR: Binary not found: {src}")
-        return False
-
-
-def parse_timing(output: str) -> dict[str, float]:
-    """Parse timing information from program output."""
-    timings = {}
-    
-    for line in output.split('\n'):
-        if ':' in line and ('ms' in line or ' s' in line):
-            parts = line.split(':')
-            if len(parts) >= 2:
-                label = parts[0].strip()
-                value_str = parts[1].strip()
-                
-                try:
-                    if 'ms' in value_str:
-                        value = float(value_str.replace('ms', '').strip())
-                    elif ' s' in value_str:
-                        value = float(value_str.replace('s', '').strip()) * 1000
-                    else:
-                        continue
-                    timings[label] = value
-                except ValueError:
-                    pass
+        messages.append(f"  ERROR: Build failed for {name}")
+        messages.append(result.stderr)
+        return False, messages
     
-    return timings
+    if dst.exists():
+        messages.append(f"  Built: {dst}")
+        return True, messages
+    else:
+        messages.append(f"  ERROR: Binary not found: {dst}")
+        return False, messages
 
 
-def parse_result(output: str) -> tuple[int, int]:
-    """Parse chain count and length from output."""
-    chain_count = 0
-    chain_length = 0
-    
-    for line in output.split('\n'):
-        if 'Found' in line and 'chain(s)' in line:
-            # "Found 1 chain(s) of length 4:"
-            parts = line.split()
-            for i, part in enumerate(parts):
-                if part == 'Found' and i + 1 < len(parts):
-                    try:
-                        chain_count = int(parts[i + 1])
-                    except ValueError:
-                        pass
-                if part == 'length' and i + 1 < len(parts):
-                    try:
-                        chain_length = int(parts[i + 1].rstrip(':'))
-                    except ValueError:
-                        pass
-    
-    return chain_count, chain_length
+@contextmanager
+def gc_disabled():
+    """Disable the garbage collector for the block, as timeit does."""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def median_abs_deviation(values: list[float]) -> float:
+    """Return the median absolute deviation from the median."""
+    med = statistics.median(values)
+    return statistics.median(abs(x - med) for x in values)
+
 
+def parse_output(lines, stop=None) -> dict:
+    """
+    Parse program output from an iterable of lines.
 
-def run_benchmark(dictionary: str, start_word: str, runs: int = 5):
-    """Run benchmark comparing all implementations."""
+    If `stop` is given, it is called with the run times so far after each
+    run, and reading ends as soon as it returns True.
+
+    Returns a dict with:
+        runs: per-run times printed with --repeat (ms), in run order
+        timings: other "label: time" lines, label -> ms
+        result: (chain_count, chain_length), or (0, 0) if not found
+        head: start of the output, for error messages
+        stopped: True if reading was ended by `stop`
+    """
+    parsed = {"runs": [], "timings": {}, "result": (0, 0), "head": "",
+              "stopped": False}
+    
+    for line in lines:
+        if len(parsed["head"]) < _HEAD_CHARS:
+            parsed["head"] = (parsed["head"] + line)[:_HEAD_CHARS]
+        
+        # Cheap checks first: most lines of a large result are chains
+        if ':' not in line:
+            continue
+        if line.startswith("Run "):
+            m = _RUN_RE.match(line)
+            if m:
+                parsed["runs"].append(
+                    float(m["value"]) * (1000 if m["unit"] == "s" else 1))
+                if stop and stop(parsed["runs"]):
+                    parsed["stopped"] = True
+                    break
+                continue
+        if line.startswith("Found"):
+            m = _RESULT_RE.match(line)
+            if m:
+                parsed["result"] = (int(m[1]), int(m[2]))
+                continue
+        m = _TIMING_RE.match(line)
+        if m:
+            parsed["timings"][m["label"].strip()] = (
+                float(m["value"]) * (1000 if m["unit"] == "s" else 1))
+    
+    return parsed
+
+
+def run_benchmark(dictionary: str, start_word: str, runs: int = 5,
+                  warmups: int = 1,
+                  implementations: list[dict] = IMPLEMENTATIONS,
+                  rebuild: bool = False):
+    """
+    Run benchmark comparing the given implementations.
+
+    Each entry of `implementations` has the same keys as IMPLEMENTATIONS;
+    they are built, run and reported in list order.
+    """
     
     print("=" * 80)
     print("ANAGRAM CHAIN BENCHMARK")
     print("=" * 80)
     print(f"Dictionary: {dictionary}")
     print(f"Start word: {start_word}")
-    print(f"Runs: {runs}")
+    print(f"Runs: up to {runs} (warm-up: {warmups})")
     print()
     
     # Build all implementations
@@ -150,12 +227,18 @@ def run_benchmark(dictionary: str, start_word: str, runs: int = 5):
     print("BUILDING")
     print("-" * 80)
     
-    # Clean first
-    subprocess.run(["make", "clean"], capture_output=True)
+    # Builds are independent, so run them in parallel; the timed runs
+    # below stay sequential to avoid CPU contention between them
+    with ThreadPoolExecutor(max_workers=len(implementations)) as executor:
+        statuses = executor.map(partial(build_implementation, rebuild=rebuild),
+                                implementations)
     
+    # Print each build's messages in order once all builds are done
     built = {}
-    for impl_config in IMPLEMENTATIONS:
-        built[impl_config["name"]] = build_implementation(impl_config)
+    for impl_config, (ok, messages) in zip(implementations, statuses):
+        for message in messages:
+            print(message)
+        built[impl_config["name"]] = ok
     
     if not any(built.values()):
         print("ERROR: No implementations built successfully")
@@ -163,51 +246,87 @@ def run_benchmark(dictionary: str, start_word: str, runs: int = 5):
     
     print()
     
+    # Resolve binary paths once, outside the measured loop. A failed build
+    # can leave an older binary behind, so only use successful builds.
+    binaries = {}
+    for impl_config in implementations:
+        name = impl_config["name"]
+        binary = Path(f"bin/anagram_chain_{name}")
+        if built[name] and binary.is_file():
+            binaries[name] = str(binary.resolve())
+    
     # Run benchmarks
     results = {}
     
-    for impl_config in IMPLEMENTATIONS:
+    for impl_config in implementations:
         name = impl_config["name"]
         label = impl_config["label"]
-        binary = Path(f"bin/anagram_chain_{name}")
         
-        if not binary.exists():
-            print(f"Skipping {name}: binary not found")
+        if name not in binaries:
+            print(f"Skipping {name}: build failed or binary not found")
             continue
         
+        base_cmd = [binaries[name], dictionary, start_word, "--repeat"]
+        
         print("-" * 80)
         print(f"BENCHMARKING: {label}")
         print("-" * 80)
         
-        times = []
-        last_output = ""
+        repeat = warmups + runs
+        
+        def stable(run_times: list[float]) -> bool:
+            """Return True once the measured runs are stable enough."""
+            measured = run_times[warmups:]
+            if len(measured) < MIN_RUNS:
+                return False
+            median = statistics.median(measured)
+            return median > 0 and median_abs_deviation(measured) / median < PRECISION
+        
+        # One launch runs the program repeatedly in one process with
+        # --repeat; it is killed as soon as the runs are stable. Collector
+        # pauses would add noise to the wall-clock time, so GC is off meanwhile.
+        with gc_disabled():
+            code, parsed, elapsed_ns = run_command(base_cmd + [str(repeat)],
+                                                   stop=stable)
         
-        for i in range(runs):
-            cmd = [str(binary), dictionary, start_word]
-            code, output, elapsed = run_command(cmd)
+        run_times = parsed["runs"]
+        times = []
+        if code == -1:
+            print("  TIMEOUT")
+        elif code != 0:
+            print(f"  ERROR (exit code {code})")
+            if parsed["head"]:
+                print(f"    {parsed['head']}")
+        elif not parsed["stopped"] and len(run_times) != repeat:
+            print(f"  ERROR: expected {repeat} run times, got {len(run_times)}")
+        else:
+            for i, t in enumerate(run_times[:warmups]):
+                print(f"  Warm-up {i+1}: {t:.2f} ms (discarded)")
+            times = run_times[warmups:]
+            for i, t in enumerate(times):
+                print(f"  Run {i+1}: {t:.2f} ms")
             
-            if code == 0:
-                times.append(elapsed * 1000)  # Convert to ms
-                last_output = output
-                print(f"  Run {i+1}: {elapsed*1000:.2f} ms")
-            elif code == -1:
-                print(f"  Run {i+1}: TIMEOUT")
-            else:
-                print(f"  Run {i+1}: ERROR (exit code {code})")
-                if output:
-                    print(f"    {output[:200]}")
+            # Wall-clock is a sanity check only: what it adds to the
+            # program's own run times is process startup and pipe overhead
+            wall_ms = elapsed_ns / 1e6  # Convert to ms
+            overhead_ms = wall_ms - sum(run_times)
+            print(f"  (wall: {wall_ms:.2f} ms for {len(run_times)} runs, "
+                  f"overhead: {overhead_ms:.2f} ms)")
+            if parsed["stopped"]:
+                print(f"  Stable after {len(times)} runs (MAD < {PRECISION:.0%} of median)")
         
         if times:
-            chain_count, chain_length = parse_result(last_output)
-            timings = parse_timing(last_output)
+            chain_count, chain_length = parsed["result"]
+            timings = parsed["timings"]
             
             results[name] = {
                 "label": label,
                 "times": times,
                 "min": min(times),
                 "max": max(times),
-                "avg": statistics.mean(times),
-                "stddev": statistics.stdev(times) if len(times) > 1 else 0,
+                "median": statistics.median(times),
+                "mad": median_abs_deviation(times),
+                "overhead": overhead_ms,
                 "chain_count": chain_count,
                 "chain_length": chain_length,
                 "internal_timings": timings
@@ -224,32 +343,32 @@ def run_benchmark(dictionary: str, start_word: str, runs: int = 5):
         print("No results to compare")
         return 1
     
+    # Implementations with results, in table order
+    present = [(c["name"], c["label"]) for c in implementations if c["name"] in results]
+    
     # Table header with all implementations
     header = f"{'Metric':<20}"
-    for impl_config in IMPLEMENTATIONS:
-        name = impl_config["name"]
-        if name in results:
-            header += f" {impl_config['label']:>18}"
+    for name, label in present:
+        header += f" {label:>18}"
     print(header)
     print("-" * 80)
     
     def format_row(label, values, unit=""):
         row = f"{label:<20}"
-        for impl_config in IMPLEMENTATIONS:
-            name = impl_config["name"]
-            if name in results:
-                val = values.get(name)
-                if val is not None:
-                    row += f" {val:>15.2f}{unit:>3}"
-                else:
-                    row += f" {'N/A':>18}"
+        for name, _ in present:
+            val = values.get(name)
+            if val is not None:
+                row += f" {val:>15.2f}{unit:>3}"
+            else:
+                row += f" {'N/A':>18}"
         print(row)
     
     # Timing metrics
-    format_row("Avg time", {n: r["avg"] for n, r in results.items()}, "ms")
+    format_row("Median time", {n: r["median"] for n, r in results.items()}, "ms")
     format_row("Min time", {n: r["min"] for n, r in results.items()}, "ms")
     format_row("Max time", {n: r["max"] for n, r in results.items()}, "ms")
-    format_row("Std dev", {n: r["stddev"] for n, r in results.items()}, "ms")
+    format_row("MAD", {n: r["mad"] for n, r in results.items()}, "ms")
+    format_row("Launch overhead", {n: r["overhead"] for n, r in results.items()}, "ms")
     
     print("-" * 80)
     
@@ -258,17 +377,13 @@ def run_benchmark(dictionary: str, start_word: str, runs: int = 5):
     chain_lengths = {n: r["chain_length"] for n, r in results.items()}
     
     row = f"{'Chain count':<20}"
-    for impl_config in IMPLEMENTATIONS:
-        name = impl_config["name"]
-        if name in results:
-            row += f" {chain_counts[name]:>18}"
+    for name, _ in present:
+        row += f" {chain_counts[name]:>18}"
     print(row)
     
     row = f"{'Chain length':<20}"
-    for impl_config in IMPLEMENTATIONS:
-        name = impl_config["name"]
-        if name in results:
-            row += f" {chain_lengths[name]:>18}"
+    for name, _ in present:
+        row += f" {chain_lengths[name]:>18}"
     print(row)
     
     # Verify results match
@@ -283,29 +398,28 @@ def run_benchmark(dictionary: str, start_word: str, runs: int = 5):
     
     # Speedup comparison (relative to AI)
     if "ai" in results:
-        ai_avg = results["ai"]["avg"]
+        ai_median = results["ai"]["median"]
         print("-" * 80)
         print("SPEEDUP vs AI")
         print("-" * 80)
-        for impl_config in IMPLEMENTATIONS:
-            name = impl_config["name"]
-            if name in results and name != "ai":
-                other_avg = results[name]["avg"]
-                if other_avg > 0:
-                    speedup = ai_avg / other_avg
+        for name, label in present:
+            if name != "ai":
+                other_median = results[name]["median"]
+                if other_median > 0:
+                    speedup = ai_median / other_median
                     if speedup > 1.0:
-                        print(f"  {impl_config['label']}: {speedup:.2f}x FASTER than AI")
+                        print(f"  {label}: {speedup:.2f}x FASTER than AI")
                     else:
-                        print(f"  {impl_config['label']}: {1/speedup:.2f}x SLOWER than AI")
+                        print(f"  {label}: {1/speedup:.2f}x SLOWER than AI")
     
     # Find fastest
     if len(results) > 1:
-        fastest = min(results.items(), key=lambda x: x[1]["avg"])
-        slowest = max(results.items(), key=lambda x: x[1]["avg"])
-        overall_speedup = slowest[1]["avg"] / fastest[1]["avg"]
+        fastest = min(results.items(), key=lambda x: x[1]["median"])
+        slowest = max(results.items(), key=lambda x: x[1]["median"])
+        overall_speedup = slowest[1]["median"] / fastest[1]["median"]
         print()
-        print(f"FASTEST: {results[fastest[0]]['label']} ({fastest[1]['avg']:.2f} ms)")
-        print(f"SLOWEST: {results[slowest[0]]['label']} ({slowest[1]['avg']:.2f} ms)")
+        print(f"FASTEST: {results[fastest[0]]['label']} ({fastest[1]['median']:.2f} ms)")
+        print(f"SLOWEST: {results[slowest[0]]['label']} ({slowest[1]['median']:.2f} ms)")
         print(f"Overall speedup: {overall_speedup:.2f}x")
     
     return 0
@@ -316,14 +430,26 @@ def main():
     dictionary = "tests/data/stress.txt"
     start_word = None
     runs = 5
+    warmups = 1
     
     # Parse arguments
-    if len(sys.argv) > 1:
-        dictionary = sys.argv[1]
-    if len(sys.argv) > 2:
-        start_word = sys.argv[2]
-    if len(sys.argv) > 3:
-        runs = int(sys.argv[3])
+    args = sys.argv[1:]
+    rebuild = "--rebuild" in args
+    if rebuild:
+        args.remove("--rebuild")
+    if len(args) > 0:
+        dictionary = args[0]
+    if len(args) > 1:
+        start_word = args[1]
+    if len(args) > 2:
+        runs = int(args[2])
+    if len(args) > 3:
+        warmups = int(args[3])
+    
+    if runs < 1 or warmups < 0:
+        print("Usage: python benchmark.py [--rebuild] [dictionary] [start_word] [runs] [warmups]")
+        print("Error: runs must be at least 1 and warmups at least 0")
+        return 1
     
     # Check dictionary exists
     if not Path(dictionary).exists():
@@ -333,13 +459,13 @@ def main():
     
     # If no start word, read first word from dictionary
     if start_word is None:
+        # Find shortest word in one pass, without keeping the word list
         with open(dictionary) as f:
-            words = [line.strip() for line in f if line.strip()]
-        # Find shortest word
-        start_word = min(words, key=len) if words else "abc"
+            words = (line.strip() for line in f)
+            start_word = min((w for w in words if w), key=len, default="abc")
         print(f"Using start word: {start_word}")
     
-    return run_benchmark(dictionary, start_word, runs)
+    return run_benchmark(dictionary, start_word, runs, warmups, rebuild=rebuild)
 
 
 if __name__ == "__main__":
@@ -722,10 +722,12 @@ void print_usage(const char *program_name)
     printf("Embedded Anagram Chain Demo\n");
     printf("===========================\n\n");
     printf("Finds the longest chain of derived anagrams in a dictionary.\n\n");
-    printf("Usage: %s <dictionary_file> <starting_word>\n\n", program_name);
+    printf("Usage: %s <dictionary_file> <starting_word> [--repeat N]\n\n",
+           program_name);
     printf("Arguments:\n");
     printf("  dictionary_file  Path to dictionary file (one word per line)\n");
-    printf("  starting_word    Word to start the chain from\n\n");
+    printf("  starting_word    Word to start the chain from\n");
+    printf("  --repeat N       Run N times, print time of each run\n\n");
     printf("Example:\n");
     printf("  %s words.txt abc\n", program_name);
 }
@@ -279,10 +279,12 @@ void print_usage(const char *prog)
     OUTPUT("Embedded Anagram Chain Demo\n");
     OUTPUT("===========================\n\n");
     OUTPUT("Finds the longest chain of derived anagrams in a dictionary.\n\n");
-    OUTPUT("Usage: %s <dictionary_file> <starting_word>\n\n", prog);
+    OUTPUT("Usage: %s <dictionary_file> <starting_word> [--repeat N]\n\n",
+           prog);
     OUTPUT("Arguments:\n");
     OUTPUT("  dictionary_file  Path to dictionary file (one word per line)\n");
-    OUTPUT("  starting_word    Word to start the chain from\n\n");
+    OUTPUT("  starting_word    Word to start the chain from\n");
+    OUTPUT("  --repeat N       Run N times, print time of each run\n\n");
     OUTPUT("Example:\n");
     OUTPUT("  %s words.txt abc\n", prog);
 #endif
@@ -11,31 +11,30 @@
 
 #include "anagram_chain.h"
 
-int main(int argc, char *argv[])
-{
-    /* Handle --help flag */
-    if (argc == 2 &&
-        (strcmp(argv[1], "--help") == 0 || strcmp(argv[1], "-h") == 0))
-    {
-        print_usage(argv[0]);
-        return 0;
-    }
-
-    /* Validate arguments */
-    if (argc != 3)
-    {
-        print_usage(argv[0]);
-        return 1;
-    }
-
-    const char *dict_file = argv[1];
-    const char *start_word = argv[2];
+/* ============================================================================
+ * Single Run
+ * ============================================================================
+ */
 
+/**
+ * @brief Load dictionary, build index and search for chains once
+ * @param dict_file Path to dictionary file
+ * @param start_word Word to start the chain from
+ * @param quiet If non-zero, print errors only
+ * @param elapsed_ms Receives load + index + search time in milliseconds
+ * @return 0 on success, 1 on error
+ */
+static int run_once(const char *dict_file, const char *start_word, int quiet,
+                    double *elapsed_ms)
+{
     /* Start total timer */
     double total_start = timer_now();
 
     /* Load dictionary */
-    printf("Loading dictionary: %s\n", dict_file);
+    if (!quiet)
+    {
+        printf("Loading dictionary: %s\n", dict_file);
+    }
     double load_start = timer_now();
 
     Dictionary *dict = dictionary_create(INITIAL_CAPACITY);
@@ -52,8 +51,11 @@ int main(int argc, char *argv[])
         return 1;
     }
 
-    timer_print("Dictionary loaded", load_start, timer_now());
-    printf("Words loaded: %zu\n", dict->count);
+    if (!quiet)
+    {
+        timer_print("Dictionary loaded", load_start, timer_now());
+        printf("Words loaded: %zu\n", dict->count);
+    }
 
     /* Verify start word exists */
     if (find_word_index(dict, start_word) < 0)
@@ -65,7 +67,10 @@ int main(int argc, char *argv[])
     }
 
     /* Build index */
-    printf("\nBuilding index...\n");
+    if (!quiet)
+    {
+        printf("\nBuilding index...\n");
+    }
     double index_start = timer_now();
     HashTable *index = build_index(dict);
     if (!index)
@@ -74,24 +79,35 @@ int main(int argc, char *argv[])
         dictionary_free(dict);
         return 1;
     }
-    timer_print("Index built", index_start, timer_now());
-    printf("Unique signatures: %zu\n", index->entry_count);
+    if (!quiet)
+    {
+        timer_print("Index built", index_start, timer_now());
+        printf("Unique signatures: %zu\n", index->entry_count);
+    }
 
     /* Find chains */
-    printf("\nSearching for longest chains starting from '%s'...\n",
-           start_word);
+    if (!quiet)
+    {
+        printf("\nSearching for longest chains starting from '%s'...\n",
+               start_word);
+    }
     double search_start = timer_now();
     ChainResults *results = find_longest_chains(index, dict, start_word);
     double search_end = timer_now();
-    timer_print("Search completed", search_start, search_end);
+    *elapsed_ms = search_end - total_start;
 
-    /* Print results */
-    print_results(dict, results);
+    if (!quiet)
+    {
+        timer_print("Search completed", search_start, search_end);
 
-    /* Print total time */
-    double total_end = timer_now();
-    printf("\nTotal execution time: ");
-    timer_print("Total", total_start, total_end);
+        /* Print results */
+        print_results(dict, results);
+
+        /* Print total time */
+        double total_end = timer_now();
+        printf("\nTotal execution time: ");
+        timer_print("Total", total_start, total_end);
+    }
 
     /* Cleanup */
     chain_results_free(results);
@@ -100,3 +116,67 @@ int main(int argc, char *argv[])
 
     return 0;
 }
+
+/* ============================================================================
+ * Main
+ * ============================================================================
+ */
+
+int main(int argc, char *argv[])
+{
+    /* Handle --help flag */
+    if (argc == 2 &&
+        (strcmp(argv[1], "--help") == 0 || strcmp(argv[1], "-h") == 0))
+    {
+        print_usage(argv[0]);
+        return 0;
+    }
+
+    /* Validate arguments */
+    if (argc != 3 && !(argc == 5 && strcmp(argv[3], "--repeat") == 0))
+    {
+        print_usage(argv[0]);
+        return 1;
+    }
+
+    const char *dict_file = argv[1];
+    const char *start_word = argv[2];
+    long repeat = 1;
+
+    if (argc == 5)
+    {
+        char *end;
+        repeat = strtol(argv[4], &end, 10);
+        if (*end != '\0' || repeat < 1)
+        {
+            fprintf(stderr, "Error: --repeat expects a positive integer\n");
+            return 1;
+        }
+    }
+
+    /*
+     * With --repeat N the whole load/index/search pipeline runs N times in
+     * this process and each run's time is printed as "Run k: <ms> ms".
+     * Only the first run prints its progress and results, so a caller
+     * can stop the program early and still have them.
+     */
+    for (long run = 1; run <= repeat; run++)
+    {
+        double elapsed_ms;
+
+        if (run_once(dict_file, start_word, run != 1, &elapsed_ms) != 0)
+        {
+            return 1;
+        }
+
+        /* Always in ms: timer_print switches to seconds with 2 decimals */
+        if (argc == 5)
+        {
+            printf("Run %ld: %.3f ms\n", run, elapsed_ms);
+            /* Pass each run to a reading pipe as soon as it finishes */
+            fflush(stdout);
+        }
+    }
+
+    return 0;
+}
@@ -12,34 +12,41 @@ Example:
     python generate_stress_dict.py stress.txt 1000 15
 """
 
+import os
 import sys
+import heapq
 import random
 import string
-from itertools import permutations
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import accumulate, chain, permutations
+
+
+def random_words(lengths: list[int], chars: str) -> list[str]:
+    """Generate random words of the given lengths from one batch of draws."""
+    raw = ''.join(random.choices(chars, k=sum(lengths)))
+    ends = list(accumulate(lengths))
+    return [raw[end - length:end] for end, length in zip(ends, lengths)]
 
 
 def generate_chain(start_word: str, max_length: int) -> list[str]:
     """Generate a chain of derived anagrams starting from a word."""
-    chain = [start_word]
-    current = start_word
+    words = [start_word]
     
     # Use printable ASCII chars (33-126), excluding some problematic ones
     chars = string.ascii_lowercase + string.digits
     
-    for _ in range(max_length - 1):
-        # Add a random character
-        new_char = random.choice(chars)
-        new_word = current + new_char
-        
-        # Shuffle to create anagram
-        word_list = list(new_word)
-        random.shuffle(word_list)
-        new_word = ''.join(word_list)
-        
-        chain.append(new_word)
-        current = new_word
+    # Draw all added characters at once
+    new_chars = random.choices(chars, k=max_length - 1)
+    
+    # Grow and shuffle a single letter list in place to create each anagram
+    letters = list(start_word)
+    for new_char in new_chars:
+        letters.append(new_char)
+        random.shuffle(letters)
+        words.append(''.join(letters))
     
-    return chain
+    return words
 
 
 def generate_branching_chains(base: str, branch_count: int, branch_length: int) -> list[str]:
@@ -47,12 +54,30 @@ def generate_branching_chains(base: str, branch_count: int, branch_length: int)
     words = [base]
     
     for _ in range(branch_count):
-        chain = generate_chain(base, branch_length)
-        words.extend(chain[1:])  # Skip the base word (already added)
+        branch = generate_chain(base, branch_length)
+        words.extend(branch[1:])  # Skip the base word (already added)
     
     return words
 
 
+def generate_chain_group(base: str, max_chain_length: int,
+                         branch_factor: int) -> list[str]:
+    """Generate the words of the main chain for a base word and its branches."""
+    # Generate main chain
+    main_chain = generate_chain(base, max_chain_length)
+    local_chains = [main_chain]
+    
+    # Add branches from middle of chain
+    for j in range(1, len(main_chain) - 1, 2):
+        if random.random() < 0.3:  # 30% chance of branching
+            local_chains.append(generate_branching_chains(
+                main_chain[j], branch_factor, max_chain_length - j
+            ))
+    
+    # Return one flat list, which is cheaper to send back than nested lists
+    return list(chain.from_iterable(local_chains))
+
+
 def generate_stress_dictionary(chain_count: int = 500, 
                                 max_chain_length: int = 12,
                                 branch_factor: int = 3) -> set[str]:
@@ -67,56 +92,49 @@ def generate_stress_dictionary(chain_count: int = 500,
     Returns:
         Set of unique words
     """
-    words = set()
-    
     # Generate base words of different lengths (2-4 chars)
-    base_words = []
-    for length in range(2, 5):
-        for _ in range(chain_count // 3):
-            base = ''.join(random.choices(string.ascii_lowercase, k=length))
-            base_words.append(base)
+    lengths = [length for length in range(2, 5) for _ in range(chain_count // 3)]
+    base_words = random_words(lengths, string.ascii_lowercase)
     
     print(f"Generating {len(base_words)} chain groups...", file=sys.stderr)
     
-    for i, base in enumerate(base_words):
-        # Generate main chain
-        chain = generate_chain(base, max_chain_length)
-        words.update(chain)
-        
-        # Add branches from middle of chain
-        for j in range(1, len(chain) - 1, 2):
-            if random.random() < 0.3:  # 30% chance of branching
-                branch_chains = generate_branching_chains(
-                    chain[j], branch_factor, max_chain_length - j
-                )
-                words.update(branch_chains)
-        
-        if (i + 1) % 100 == 0:
-            print(f"  Generated {i + 1}/{len(base_words)} groups ({len(words)} words)", 
-                  file=sys.stderr)
+    # Chain groups are independent, so generate them in worker processes.
+    # Each worker reseeds its RNG; forked workers would otherwise share
+    # the parent's random state and produce identical chains.
+    workers = os.cpu_count() or 1
+    generate_group = partial(generate_chain_group,
+                             max_chain_length=max_chain_length,
+                             branch_factor=branch_factor)
+    words = set()
+    with ProcessPoolExecutor(max_workers=workers, initializer=random.seed) as executor:
+        groups = executor.map(generate_group, base_words,
+                              chunksize=max(1, len(base_words) // (workers * 4)))
+        for i, group_words in enumerate(groups):
+            # One bulk update per group; the group lists are not kept
+            words.update(group_words)
+            
+            if (i + 1) % 100 == 0:
+                print(f"  Generated {i + 1}/{len(base_words)} groups ({len(words)} words)",
+                      file=sys.stderr)
     
     # Add some random words to increase dictionary size
     extra_count = len(words) // 2
     print(f"Adding {extra_count} random words...", file=sys.stderr)
     
-    for _ in range(extra_count):
-        length = random.randint(3, 12)
-        word = ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
-        words.add(word)
+    lengths = random.choices(range(3, 13), k=extra_count)
+    words.update(random_words(lengths, string.ascii_lowercase + string.digits))
     
     return words
 
 
 def find_good_start_word(words: set[str]) -> str:
     """Find a short word that likely starts a long chain."""
-    # Sort by length, prefer shorter words
-    sorted_words = sorted(words, key=len)
-    
-    # Return one of the shortest words
-    short_words = [w for w in sorted_words if len(w) <= 3]
+    # Return one of the shortest words; only the 10 shortest are kept,
+    # so the whole set is never sorted
+    short_words = heapq.nsmallest(10, (w for w in words if len(w) <= 3), key=len)
     if short_words:
-        return random.choice(short_words[:10])
-    return sorted_words[0]
+        return random.choice(short_words)
+    return min(words, key=len)
 
 
 def main():
@@ -133,10 +151,9 @@ def main():
     # Find a good starting word
     start_word = find_good_start_word(words)
     
-    # Write dictionary
+    # Write dictionary in one writelines call instead of a write per word
     with open(output_file, 'w') as f:
-        for word in sorted(words):
-            f.write(word + '\n')
+        f.writelines(word + '\n' for word in sorted(words))
     
     print(f"\nGenerated {len(words)} words to {output_file}", file=sys.stderr)
     print(f"Suggested start word: {start_word}", file=sys.stderr)